@@ -12,6 +12,7 @@ import threading, time
 from alpaca.trading.requests import GetOrderByIdRequest
 from alpaca.trading.enums import OrderStatus
 import math
+import numpy as np
 from alpaca.common.exceptions import APIError
 
 load_dotenv()
@@ -20,6 +21,14 @@ API_KEY = os.environ.get("APCA_API_KEY_ID")
 API_SECRET = os.environ.get("APCA_API_SECRET_KEY")
 PAPER = os.environ.get("ALPACA_PAPER", "true").lower() == "true"
 
+_PRINT_LOCK = threading.Lock()
+
+
+def log(message):
+    # Option chains and recommendations are fetched from worker threads; keep each line intact
+    with _PRINT_LOCK:
+        print(message, flush=True)
+
 
 def init_alpaca_client():
     try:
@@ -385,10 +394,37 @@ def get_alpaca_option_chain(symbol):
             option_chain[expiry][strike][cp] = contract
         return option_chain
     except Exception as e:
-        print(f"Error fetching Alpaca option chain for {symbol}: {e}")
+        log(f"Error fetching Alpaca option chain for {symbol}: {e}")
         return None
 
 
+def option_chain_arrays(option_chain, expiries=None):
+    """
+    Convert the nested chain from get_alpaca_option_chain into per-expiry arrays.
+    Only the given expiries (default: all) and strikes with both a call and a put are kept.
+    Returns a dict: {expiry: {'strikes': ndarray, 'calls': ndarray, 'puts': ndarray}}
+    """
+    arrays = {}
+    for expiry in (option_chain.keys() if expiries is None else expiries):
+        strikes = option_chain.get(expiry)
+        if not strikes:
+            continue
+        paired = sorted(
+            (strike, legs['call'].symbol, legs['put'].symbol)
+            for strike, legs in strikes.items()
+            if legs.get('call') and legs.get('put')
+        )
+        if not paired:
+            continue
+        k_sorted, call_syms, put_syms = zip(*paired)
+        arrays[expiry] = {
+            'strikes': np.asarray(k_sorted, dtype=float),
+            'calls': np.asarray(call_syms, dtype=object),
+            'puts': np.asarray(put_syms, dtype=object),
+        }
+    return arrays
+
+
 def select_expiries_and_strike_alpaca(symbol, earnings_date):
     """
     Use Alpaca's option chain to select front and back month expiries and ATM strike for the calendar spread.
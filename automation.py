@@ -9,16 +9,19 @@ Always consult a professional financial advisor before making any investment dec
 
 
 import requests
+import orjson
 import yfinance as yf
 from datetime import datetime, timedelta, timezone
-from scipy.interpolate import interp1d
 import numpy as np
+import bottleneck as bn
+from numba import njit
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import urllib.parse
 import os
 from dotenv import load_dotenv
 import argparse
-from alpaca_integration import get_alpaca_option_chain, init_alpaca_client
+from alpaca_integration import get_alpaca_option_chain, init_alpaca_client, option_chain_arrays, log
 from alpaca.data.historical.option import OptionHistoricalDataClient
 from alpaca.data.requests import OptionLatestQuoteRequest, OptionSnapshotRequest
 from alpaca.data.historical import StockHistoricalDataClient
@@ -31,61 +34,122 @@ import pandas as pd
 load_dotenv()
 GOOGLE_SCRIPT_URL = os.environ.get("GOOGLE_SCRIPT_URL")
 
+# Number of nearest strikes per expiry to request snapshots for
+ATM_STRIKE_CANDIDATES = 3
+# Maximum number of symbols Alpaca accepts in one option snapshot request
+SNAPSHOT_BATCH_SIZE = 100
+# Worker threads used to screen tickers concurrently
+MAX_WORKERS = 10
+API_KEY = os.environ.get("APCA_API_KEY_ID")
+API_SECRET = os.environ.get("APCA_API_SECRET_KEY")
+
+# Alpaca data clients are created lazily and shared so their HTTP sessions are reused across tickers
+_STOCK_CLIENT = None
+_OPTIONS_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def get_stock_client():
+    global _STOCK_CLIENT
+    if _STOCK_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _STOCK_CLIENT is None:
+                _STOCK_CLIENT = StockHistoricalDataClient(API_KEY, API_SECRET)
+    return _STOCK_CLIENT
+
+def get_options_client():
+    global _OPTIONS_CLIENT
+    if _OPTIONS_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _OPTIONS_CLIENT is None:
+                _OPTIONS_CLIENT = OptionHistoricalDataClient(api_key=API_KEY, secret_key=API_SECRET)
+    return _OPTIONS_CLIENT
+
+# Reference date for expiry filtering and DTE math; refreshed at the start of main()
+TODAY = datetime.today().date()
+
 def filter_dates(dates):
-    today = datetime.today().date()
-    cutoff_date = today + timedelta(days=45)
-    
-    sorted_dates = sorted(datetime.strptime(date, "%Y-%m-%d").date() for date in dates)
+    arr = np.array(dates, dtype='datetime64[D]')
+    arr.sort()
+    today = np.datetime64(TODAY, 'D')
+    cutoff_date = today + np.timedelta64(45, 'D')
+
+    idx = int(np.searchsorted(arr, cutoff_date))
+    if idx == len(arr):
+        raise ValueError("No date 45 days or more in the future found.")
+
+    arr = arr[:idx+1]
+    if arr[0] == today:
+        arr = arr[1:]
+    return np.datetime_as_string(arr, unit='D').tolist()
+
+
+def days_to_expiry(dates):
+    return (np.array(dates, dtype='datetime64[D]') - np.datetime64(TODAY, 'D')).astype(int).tolist()
+
+
+# Yang-Zhang k for the default 30-day window
+_K30 = 0.34 / (1.34 + (31.0 / 29.0))
+
+
+@njit(cache=True, error_model='numpy')
+def _yang_zhang_last(o, h, l, c, window, trading_periods):
+    # Fused single pass over the last `window` bars; needs one extra bar for the previous close
+    n = len(c)
+    if window < 2 or n < window + 1:
+        return np.nan
+    close_vol_sum = 0.0
+    open_vol_sum = 0.0
+    rs_sum = 0.0
+    for i in range(n - window, n):
+        log_ho = np.log(h[i] / o[i])
+        log_lo = np.log(l[i] / o[i])
+        log_co = np.log(c[i] / o[i])
+        log_oc = np.log(o[i] / c[i - 1])
+        log_cc = np.log(c[i] / c[i - 1])
+        close_vol_sum += log_cc * log_cc
+        open_vol_sum += log_oc * log_oc
+        rs_sum += log_ho * (log_ho - log_co) + log_lo * (log_lo - log_co)
+    k = _K30 if window == 30 else 0.34 / (1.34 + ((window + 1) / (window - 1)))
+    var = (open_vol_sum + k * close_vol_sum + (1 - k) * rs_sum) / (window - 1.0)
+    return np.sqrt(var) * np.sqrt(trading_periods)
 
-    arr = []
-    for i, date in enumerate(sorted_dates):
-        if date >= cutoff_date:
-            arr = [d.strftime("%Y-%m-%d") for d in sorted_dates[:i+1]]  
-            break
-    
-    if len(arr) > 0:
-        if arr[0] == today.strftime("%Y-%m-%d"):
-            return arr[1:]
-        return arr
 
-    raise ValueError("No date 45 days or more in the future found.")
+def yang_zhang_nd(ohlc, window=30, trading_periods=252):
+    # ohlc is a (T, 4) array of Open, High, Low, Close sorted by date
+    # np.float64 so a zero RV divides to inf like the pandas version instead of raising
+    return np.float64(_yang_zhang_last(ohlc[:, 0], ohlc[:, 1], ohlc[:, 2], ohlc[:, 3], window, trading_periods))
 
 
 def yang_zhang(price_data, window=30, trading_periods=252, return_last_only=True):
-    log_ho = (price_data['High'] / price_data['Open']).apply(np.log)
-    log_lo = (price_data['Low'] / price_data['Open']).apply(np.log)
-    log_co = (price_data['Close'] / price_data['Open']).apply(np.log)
-    
-    log_oc = (price_data['Open'] / price_data['Close'].shift(1)).apply(np.log)
+    o, h, l, c = price_data[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64).T
+    if return_last_only:
+        return np.float64(_yang_zhang_last(o, h, l, c, window, trading_periods))
+    if len(c) < window:
+        return pd.Series(dtype=float, index=price_data.index[:0])
+
+    log_ho = np.log(h / o)
+    log_lo = np.log(l / o)
+    log_co = np.log(c / o)
+
+    # First row has no previous close, keep it NaN like Series.shift(1)
+    log_oc = np.full_like(o, np.nan)
+    log_oc[1:] = np.log(o[1:] / c[:-1])
     log_oc_sq = log_oc**2
-    
-    log_cc = (price_data['Close'] / price_data['Close'].shift(1)).apply(np.log)
+
+    log_cc = np.full_like(c, np.nan)
+    log_cc[1:] = np.log(c[1:] / c[:-1])
     log_cc_sq = log_cc**2
-    
-    rs = log_ho * (log_ho - log_co) + log_lo * (log_lo - log_co)
-    
-    close_vol = log_cc_sq.rolling(
-        window=window,
-        center=False
-    ).sum() * (1.0 / (window - 1.0))
 
-    open_vol = log_oc_sq.rolling(
-        window=window,
-        center=False
-    ).sum() * (1.0 / (window - 1.0))
+    rs = log_ho * (log_ho - log_co) + log_lo * (log_lo - log_co)
 
-    window_rs = rs.rolling(
-        window=window,
-        center=False
-    ).sum() * (1.0 / (window - 1.0))
+    close_vol = bn.move_sum(log_cc_sq, window, min_count=window) / (window - 1.0)
+    open_vol = bn.move_sum(log_oc_sq, window, min_count=window) / (window - 1.0)
+    window_rs = bn.move_sum(rs, window, min_count=window) / (window - 1.0)
 
-    k = 0.34 / (1.34 + ((window + 1) / (window - 1)) )
-    result = (open_vol + k * close_vol + (1 - k) * window_rs).apply(np.sqrt) * np.sqrt(trading_periods)
+    k = _K30 if window == 30 else 0.34 / (1.34 + ((window + 1) / (window - 1)))
+    result = np.sqrt(open_vol + k * close_vol + (1 - k) * window_rs) * np.sqrt(trading_periods)
 
-    if return_last_only:
-        return result.iloc[-1]
-    else:
-        return result.dropna()
+    return pd.Series(result, index=price_data.index).dropna()
     
 
 def build_term_structure(days, ivs):
@@ -100,23 +164,95 @@ def build_term_structure(days, ivs):
     ivs = ivs[sort_idx]
 
 
-    spline = interp1d(days, ivs, kind='linear', fill_value="extrapolate")
-
     def term_spline(dte):
-        if dte < days[0]:  
-            return ivs[0]
-        elif dte > days[-1]:
-            return ivs[-1]
-        else:  
-            return float(spline(dte))
+        # Flat extrapolation outside the sampled expiries
+        return float(np.interp(np.clip(dte, days[0], days[-1]), days, ivs))
 
     return term_spline
 
+def nearest_strike_index(strikes, price):
+    return int(np.abs(strikes - price).argmin())
+
+def nearest_strike_indices(strikes, price, k):
+    # Indices of the k strikes closest to price, nearest first
+    abs_diff = np.abs(strikes - price)
+    if k < len(abs_diff):
+        # Keep every strike within the k-th distance, in ascending strike order, so ties
+        # (including at the cutoff) resolve to the lower strike
+        kth = np.partition(abs_diff, k - 1)[k - 1]
+        order = np.flatnonzero(abs_diff <= kth)
+    else:
+        order = np.arange(len(abs_diff))
+    return order[np.argsort(abs_diff[order], kind='stable')][:k]
+
+def get_last_close(ticker):
+    # Latest Alpaca bar first, then the last close of Yahoo's daily history
+    try:
+        bar_resp = get_stock_client().get_stock_latest_bar(StockLatestBarRequest(symbol_or_symbols=ticker))
+        if bar_resp and ticker.upper() in bar_resp:
+            price = bar_resp[ticker.upper()].close
+            log(f"[{ticker}] Got current price from Alpaca: {price}")
+            return price
+    except Exception as e:
+        log(f"[{ticker}] Error getting Alpaca current price: {e}")
+    price = yf.Ticker(ticker).history(period='1d')['Close'].iloc[-1]
+    log(f"[{ticker}] Using Yahoo for current price: {price}")
+    return price
+
 def get_current_price(ticker):
-    todays_data = ticker.history(period='1d')
-    return todays_data['Close'].iloc[0]
+    return get_last_close(ticker.ticker)
+
+def bars_to_ohlc(bars):
+    # Pack Alpaca bars into a (T, 4) Open/High/Low/Close array sorted by timestamp
+    ohlc = np.empty((len(bars), 4), dtype=np.float64)
+    for i, b in enumerate(bars):
+        ohlc[i] = (b.open, b.high, b.low, b.close)
+    ts = np.fromiter((b.timestamp.timestamp() for b in bars), dtype=np.float64, count=len(bars))
+    return ohlc[ts.argsort(kind='stable')]
+
+def fetch_daily_bars(symbols, days=90):
+    """
+    Fetch daily bars for many symbols in a single Alpaca request.
+    Returns a dict: {symbol: ndarray of shape (T, 4) with Open, High, Low, Close}
+    """
+    end_dt = datetime.now(timezone.utc)
+    bars_request = StockBarsRequest(
+        symbol_or_symbols=list(symbols),
+        timeframe=TimeFrame.Day,
+        start=end_dt - timedelta(days=days),
+        end=end_dt,
+        feed=DataFeed.IEX
+    )
+    bars_response = get_stock_client().get_stock_bars(bars_request)
+    bars_by_symbol = getattr(bars_response, 'data', None) or {}
+    ohlc_by_symbol = {}
+    for symbol, bars in bars_by_symbol.items():
+        if bars:
+            ohlc_by_symbol[symbol] = bars_to_ohlc(bars)
+    return ohlc_by_symbol
+
+def _finalize(ticker, source, atm_iv, ohlc, volumes, underlying_price, straddle):
+    # Shared tail of both data sources: term structure, RV30, volume and expected move
+    dtes = days_to_expiry(list(atm_iv.keys()))
+    ivs = list(atm_iv.values())
+    term_spline = build_term_structure(dtes, ivs)
+    iv30 = term_spline(30)
+    iv45 = term_spline(45)
+    iv_first = term_spline(dtes[0])
+    ts_slope_0_45 = (iv45 - iv_first) / (45-dtes[0])
 
-def compute_recommendation(ticker):
+    rv30 = yang_zhang_nd(ohlc)
+    iv30_rv30 = iv30 / rv30
+    log(f"[{ticker}] {source} IV30={iv30:.4f}, RV30={rv30:.4f}, Ratio={iv30_rv30:.4f}")
+
+    avg_volume = volumes[-30:].mean() if len(volumes) >= 30 else np.nan
+    expected_move = str(round(straddle / underlying_price * 100, 2)) + "%" if straddle else None
+    return {'avg_volume': avg_volume >= 1500000, 
+            'iv30_rv30': iv30_rv30 >= 1.25, 
+            'ts_slope_0_45': ts_slope_0_45 <= -0.00406, 
+            'expected_move': expected_move}
+
+def compute_recommendation(ticker, price_bars=None):
     try:
         ticker = ticker.strip().upper()
         if not ticker:
@@ -128,48 +264,38 @@ def compute_recommendation(ticker):
         alpaca_success = False
         if option_chain:
             try:
-                print(f"[{ticker}] Attempting to use Alpaca option chain data")
+                log(f"[{ticker}] Attempting to use Alpaca option chain data")
                 exp_dates = sorted(option_chain.keys())
                 # apply 45-day window and drop 0DTE using filter_dates()
                 try:
                     exp_dates_filtered = filter_dates(exp_dates)
                 except ValueError:
-                    print(f"[{ticker}] Not enough option data from Alpaca")
+                    log(f"[{ticker}] Not enough option data from Alpaca")
                     return "Error: Not enough option data."
-                underlying_price = None
-                try:
-                    API_KEY = os.environ.get("APCA_API_KEY_ID")
-                    API_SECRET = os.environ.get("APCA_API_SECRET_KEY")
-                    stock_client = StockHistoricalDataClient(API_KEY, API_SECRET)
-                    bar_resp = stock_client.get_stock_latest_bar(StockLatestBarRequest(symbol_or_symbols=ticker))
-                    if bar_resp and ticker.upper() in bar_resp:
-                        underlying_price = bar_resp[ticker.upper()].close
-                        print(f"[{ticker}] Got current price from Alpaca: {underlying_price}")
-                except Exception as e:
-                    print(f"[{ticker}] Error getting Alpaca current price: {e}")
-                    pass
-                if underlying_price is None:
-                    stock = yf.Ticker(ticker)
-                    underlying_price = stock.history(period='1d')['Close'].iloc[0]
-                    print(f"[{ticker}] Using Yahoo for current price: {underlying_price}")
-                options_client = OptionHistoricalDataClient(
-                    api_key=os.environ.get("APCA_API_KEY_ID"),
-                    secret_key=os.environ.get("APCA_API_SECRET_KEY")
-                )
+                underlying_price = get_last_close(ticker)
+                options_client = get_options_client()
+                # Pass 1: collect the nearest strikes for every expiry so the
+                # snapshots can be fetched in a single batched request
+                candidates = {}
+                snapshot_symbols = []
+                chain_arrays = option_chain_arrays(option_chain, exp_dates_filtered)
                 for exp_date in exp_dates_filtered:
-                    strikes = option_chain[exp_date].keys()
-                    if not strikes:
+                    chain = chain_arrays.get(exp_date)
+                    if chain is None:
                         continue
-                    sorted_strikes = sorted(strikes, key=lambda s: abs(s - underlying_price))
-                    for strike in sorted_strikes:
-                        call_contract = option_chain[exp_date][strike].get('call')
-                        put_contract  = option_chain[exp_date][strike].get('put')
-                        if not call_contract or not put_contract:
-                            continue
-                        call_symbol = call_contract.symbol
-                        put_symbol  = put_contract.symbol
-                        req         = OptionSnapshotRequest(symbol_or_symbols=[call_symbol, put_symbol])
-                        snap_resp   = options_client.get_option_snapshot(req)
+                    order = nearest_strike_indices(chain['strikes'], underlying_price, ATM_STRIKE_CANDIDATES)
+                    call_syms = chain['calls'][order]
+                    put_syms = chain['puts'][order]
+                    candidates[exp_date] = list(zip(chain['strikes'][order].tolist(), call_syms, put_syms))
+                    snapshot_symbols.extend(call_syms)
+                    snapshot_symbols.extend(put_syms)
+                snap_resp = {}
+                for start in range(0, len(snapshot_symbols), SNAPSHOT_BATCH_SIZE):
+                    req = OptionSnapshotRequest(symbol_or_symbols=snapshot_symbols[start:start + SNAPSHOT_BATCH_SIZE])
+                    snap_resp.update(options_client.get_option_snapshot(req) or {})
+                # Pass 2: for each expiry take the nearest strike with IV on both legs
+                for exp_date, exp_candidates in candidates.items():
+                    for strike, call_symbol, put_symbol in exp_candidates:
                         call_snap   = snap_resp.get(call_symbol)
                         put_snap    = snap_resp.get(put_symbol)
                         if not call_snap or not put_snap:
@@ -200,96 +326,32 @@ def compute_recommendation(ticker):
                 # Only accept Alpaca data if there are at least two expiries worth of IVs
                 if len(atm_iv) >= 2:
                     alpaca_success = True
-                    print(f"[{ticker}] Successfully retrieved Alpaca IV data for {len(atm_iv)} expiries")
-                    # Calculate term structure from Alpaca IV data
-                    today = datetime.today().date()
-                    dtes = []
-                    ivs = []
-                    for exp_date, iv in atm_iv.items():
-                        exp_date_obj = datetime.strptime(exp_date, "%Y-%m-%d").date()
-                        days_to_expiry = (exp_date_obj - today).days
-                        dtes.append(days_to_expiry)
-                        ivs.append(iv)
-                    term_spline = build_term_structure(dtes, ivs)
-                    ts_slope_0_45 = (term_spline(45) - term_spline(dtes[0])) / (45-dtes[0])
+                    log(f"[{ticker}] Successfully retrieved Alpaca IV data for {len(atm_iv)} expiries")
                     
                     # Now that we have Alpaca IV data, calculate RV using Alpaca data too
-                    print(f"[{ticker}] Attempting to calculate RV using Alpaca price history...")
+                    log(f"[{ticker}] Attempting to calculate RV using Alpaca price history...")
                     try:
-                        now_utc = datetime.now(timezone.utc)
-                        end_dt = now_utc
-                        start_dt = end_dt - timedelta(days=90)  # Get 3 months of data
-                        
-                        bars_request = StockBarsRequest(
-                            symbol_or_symbols=ticker,
-                            timeframe=TimeFrame.Day,
-                            start=start_dt,
-                            end=end_dt,
-                            feed=DataFeed.IEX
-                        )
-                        
-                        bars_response = stock_client.get_stock_bars(bars_request)
-                        
-                        # Process bar data for RV calculation
-                        ticker_data_list = []
-                        if bars_response:
-                            try:
-                                # Try to access data properly - different Alpaca API versions may structure data differently
-                                if hasattr(bars_response, 'data') and hasattr(bars_response.data, 'get'):
-                                    # Newer Alpaca SDK structure
-                                    ticker_data_list = bars_response.data.get(ticker, [])
-                                else:
-                                    # Direct dictionary access (older style)
-                                    ticker_data_list = bars_response[ticker]
-                            except (KeyError, AttributeError) as e:
-                                print(f"[{ticker}] Error accessing bars data structure: {e}")
-                                
-                            
-                            if ticker_data_list:
-                                bars_data = []
-                                for bar in ticker_data_list:
-                                    bars_data.append({
-                                        'Open': bar.open,
-                                        'High': bar.high,
-                                        'Low': bar.low,
-                                        'Close': bar.close,
-                                        'Volume': bar.volume,
-                                        'Date': bar.timestamp
-                                    })
-                                
-                                if len(bars_data) >= 30:  # Need at least 30 days for Yang-Zhang
-                                    price_df = pd.DataFrame(bars_data)
-                                    price_df.set_index('Date', inplace=True)
-                                    price_df.sort_index(inplace=True)  # Ensure data is sorted by date
-                                    
-                                    # Calculate RV using Yang-Zhang
-                                    rv30 = yang_zhang(price_df)
-                                    iv30_rv30 = term_spline(30) / rv30
-                                    print(f"[{ticker}] USING ALPACA FOR BOTH IV AND RV. IV30={term_spline(30):.4f}, RV30={rv30:.4f}, Ratio={iv30_rv30:.4f}")
-                                    
-                                    # Always use Yahoo for average volume calculation
-                                    print(f"[{ticker}] Fetching volume data from Yahoo Finance")
-                                    stock_yf = yf.Ticker(ticker)
-                                    price_history = stock_yf.history(period='3mo')
-                                    avg_volume = price_history['Volume'].rolling(30).mean().dropna().iloc[-1]
-                                    
-                                    expected_move = str(round(straddle / underlying_price * 100, 2)) + "%" if straddle else None
-                                    
-                                    return {'avg_volume': avg_volume >= 1500000, 
-                                            'iv30_rv30': iv30_rv30 >= 1.25, 
-                                            'ts_slope_0_45': ts_slope_0_45 <= -0.00406, 
-                                            'expected_move': expected_move}
-                                else:
-                                    print(f"[{ticker}] Not enough bars from Alpaca (need >= 30, got {len(bars_data)}). Falling back to Yahoo.")
-                            else:
-                                print(f"[{ticker}] No bar data found in the Alpaca response. Falling back to Yahoo.")
+                        ohlc = price_bars
+                        if ohlc is None:
+                            ohlc = fetch_daily_bars([ticker]).get(ticker)
+
+                        if ohlc is None or len(ohlc) == 0:
+                            log(f"[{ticker}] No bar data found in the Alpaca response. Falling back to Yahoo.")
+                        elif len(ohlc) >= 30:  # Need at least 30 days for Yang-Zhang
+                            # Always use Yahoo for average volume calculation
+                            log(f"[{ticker}] Fetching volume data from Yahoo Finance")
+                            price_history = yf.Ticker(ticker).history(period='3mo')
+                            volumes = price_history['Volume'].to_numpy()
+                            return _finalize(ticker, "USING ALPACA FOR BOTH IV AND RV.", atm_iv, ohlc, volumes, underlying_price, straddle)
+                        else:
+                            log(f"[{ticker}] Not enough bars from Alpaca (need >= 30, got {len(ohlc)}). Falling back to Yahoo.")
                     except Exception as e:
-                        print(f"[{ticker}] Error calculating RV from Alpaca data: {e}. Falling back to Yahoo.")
+                        log(f"[{ticker}] Error calculating RV from Alpaca data: {e}. Falling back to Yahoo.")
             except Exception as e:
-                print(f"[{ticker}] Alpaca option chain processing error: {e}")
+                log(f"[{ticker}] Alpaca option chain processing error: {e}")
 
         # Use Yahoo Finance for both IV and RV if Alpaca failed
-        print(f"[{ticker}] USING YAHOO FINANCE FOR BOTH IV AND RV CALCULATIONS")
+        log(f"[{ticker}] USING YAHOO FINANCE FOR BOTH IV AND RV CALCULATIONS")
         try:
             stock = yf.Ticker(ticker)
             if len(stock.options) == 0:
@@ -304,31 +366,34 @@ def compute_recommendation(ticker):
         options_chains = {}
         for exp_date in exp_dates:
             options_chains[exp_date] = stock.option_chain(exp_date)
+        # One Yahoo history download serves the current price, RV and volume
         try:
-            underlying_price = stock.history(period='1d')['Close'].iloc[0]
+            price_history = stock.history(period='3mo')
+            underlying_price = price_history['Close'].iloc[-1]
         except Exception:
             return "Error: Unable to retrieve underlying stock price."
         i = 0
         atm_iv = {}  # Reset atm_iv for Yahoo data
         straddle = None  # Reset straddle for Yahoo data
         for exp_date, chain in options_chains.items():
-            calls = getattr(chain, 'calls', None)
-            puts = getattr(chain, 'puts', None)
-            if calls is None or puts is None or calls.empty or puts.empty:
+            calls, puts = chain.calls, chain.puts
+            strikes_c = calls['strike'].to_numpy()
+            strikes_p = puts['strike'].to_numpy()
+            if len(strikes_c) == 0 or len(strikes_p) == 0:
                 continue
-            call_diffs = (calls['strike'] - underlying_price).abs()
-            call_idx = call_diffs.idxmin()
-            call_iv = calls.loc[call_idx, 'impliedVolatility']
-            put_diffs = (puts['strike'] - underlying_price).abs()
-            put_idx = put_diffs.idxmin()
-            put_iv = puts.loc[put_idx, 'impliedVolatility']
+            ivs_c = calls['impliedVolatility'].to_numpy()
+            ivs_p = puts['impliedVolatility'].to_numpy()
+            call_idx = nearest_strike_index(strikes_c, underlying_price)
+            put_idx = nearest_strike_index(strikes_p, underlying_price)
+            call_iv = ivs_c[call_idx]
+            put_iv = ivs_p[put_idx]
             atm_iv_value = (call_iv + put_iv) / 2.0
             atm_iv[exp_date] = atm_iv_value
             if i == 0:
-                call_bid = calls.loc[call_idx, 'bid']
-                call_ask = calls.loc[call_idx, 'ask']
-                put_bid = puts.loc[put_idx, 'bid']
-                put_ask = puts.loc[put_idx, 'ask']
+                call_bid = calls['bid'].to_numpy()[call_idx]
+                call_ask = calls['ask'].to_numpy()[call_idx]
+                put_bid = puts['bid'].to_numpy()[put_idx]
+                put_ask = puts['ask'].to_numpy()[put_idx]
                 if call_bid is not None and call_ask is not None:
                     call_mid = (call_bid + call_ask) / 2.0
                 else:
@@ -342,30 +407,20 @@ def compute_recommendation(ticker):
             i += 1
         if not atm_iv:
             return "Error: Could not determine ATM IV for any expiration dates."
-        today = datetime.today().date()
-        dtes = []
-        ivs = []
-        for exp_date, iv in atm_iv.items():
-            exp_date_obj = datetime.strptime(exp_date, "%Y-%m-%d").date()
-            days_to_expiry = (exp_date_obj - today).days
-            dtes.append(days_to_expiry)
-            ivs.append(iv)
-        term_spline = build_term_structure(dtes, ivs)
-        ts_slope_0_45 = (term_spline(45) - term_spline(dtes[0])) / (45-dtes[0])
-        
+
         # Use Yahoo for RV calculation
-        price_history = stock.history(period='3mo')
-        rv30 = yang_zhang(price_history)
-        iv30_rv30 = term_spline(30) / rv30
-        print(f"[{ticker}] Yahoo IV30={term_spline(30):.4f}, RV30={rv30:.4f}, Ratio={iv30_rv30:.4f}")
-        avg_volume = price_history['Volume'].rolling(30).mean().dropna().iloc[-1]
-        expected_move = str(round(straddle / underlying_price * 100,2)) + "%" if straddle else None
-        return {'avg_volume': avg_volume >= 1500000, 'iv30_rv30': iv30_rv30 >= 1.25, 'ts_slope_0_45': ts_slope_0_45 <= -0.00406, 'expected_move': expected_move}
+        ohlc = price_history[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64)
+        volumes = price_history['Volume'].to_numpy()
+        return _finalize(ticker, "Yahoo", atm_iv, ohlc, volumes, underlying_price, straddle)
     except Exception as e:
-        print(f"Error for {ticker}: {e}")
+        log(f"Error for {ticker}: {e}")
         return f"Error: {e}"
         
 
+# Shared keep-alive session for the Dolthub earnings calendar
+_HTTP = requests.Session()
+_HTTP.headers["Accept-Encoding"] = "gzip"
+
 def get_tomorrows_earnings():
     # Determine next open market day using Alpaca clock; fallback to next calendar day
     client = init_alpaca_client()
@@ -381,12 +436,12 @@ def get_tomorrows_earnings():
     base_url = "https://www.dolthub.com/api/v1alpha1/post-no-preference/earnings/master"
     query = f"SELECT * FROM `earnings_calendar` where date = '{tomorrow}' ORDER BY `act_symbol` ASC, `date` ASC LIMIT 1000;"
     url = f"{base_url}?q={urllib.parse.quote(query)}"
-    response = requests.get(url)
-    data = response.json()
+    response = _HTTP.get(url, timeout=10)
+    data = orjson.loads(response.content)
     # Return a list of dicts with act_symbol and when
     tickers = [
         {'act_symbol': row['act_symbol'], 'when': row.get('when')}
-        for row in data.get('rows', []) if 'act_symbol' in row
+        for row in data.get('rows', ()) if 'act_symbol' in row
     ]
     return tickers
 
@@ -395,68 +450,80 @@ def get_todays_earnings():
     base_url = "https://www.dolthub.com/api/v1alpha1/post-no-preference/earnings/master"
     query = f"SELECT * FROM `earnings_calendar` where date = '{today}' ORDER BY `act_symbol` ASC, `date` ASC LIMIT 1000;"
     url = f"{base_url}?q={urllib.parse.quote(query)}"
-    response = requests.get(url)
-    data = response.json()
+    response = _HTTP.get(url, timeout=10)
+    data = orjson.loads(response.content)
     # Return a list of dicts with act_symbol and when
     tickers = [
         {'act_symbol': row['act_symbol'], 'when': row.get('when')}
-        for row in data.get('rows', []) if 'act_symbol' in row
+        for row in data.get('rows', ()) if 'act_symbol' in row
     ]
     return tickers
 
+def _safe_recommendation(symbol, price_bars=None):
+    try:
+        return compute_recommendation(symbol, price_bars)
+    except Exception as e:
+        log(f"Error for {symbol}: {e}")
+        return None
+
+def screen_tickers(symbols, ignore_filters=False, max_workers=MAX_WORKERS):
+    # Pull price history for every ticker in one request; tickers missing here fetch their own
+    normalized = [s.strip().upper() for s in symbols]
+    try:
+        price_bars = fetch_daily_bars([s for s in normalized if s]) if any(normalized) else {}
+    except Exception as e:
+        log(f"Error fetching batched Alpaca bars: {e}")
+        price_bars = {}
+    # compute_recommendation is network-bound, so overlap the per-ticker requests
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_safe_recommendation, symbols, [price_bars.get(s) for s in normalized]))
+    screened = []
+    for symbol, result in zip(symbols, results):
+        if result is None:
+            continue
+        if ignore_filters:
+            screened.append({'ticker': symbol, 'result': result})
+        elif (
+            isinstance(result, dict)
+            and result.get('avg_volume')
+            and result.get('iv30_rv30')
+            and result.get('ts_slope_0_45')
+        ):
+            screened.append({'ticker': symbol, 'result': result})
+    return screened
+
 def main():
+    global TODAY
+    TODAY = datetime.today().date()
+
     parser = argparse.ArgumentParser()
     parser.add_argument('--ignore-filters', action='store_true', help='Print all results regardless of filter criteria')
     args = parser.parse_args()
     ignore_filters = args.ignore_filters
 
+    # Fetch today's and tomorrow's earnings calendars concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            executor.submit(get_todays_earnings): 'today',
+            executor.submit(get_tomorrows_earnings): 'tomorrow',
+        }
+        calendars = {futures[f]: f.result() for f in as_completed(futures)}
+    todays = calendars['today']
+    tomorrows = calendars['tomorrow']
+
     # Process AMC earnings for today
-    todays = get_todays_earnings()
     amc_tickers = [t for t in todays if t.get('when') and 'after' in t['when'].lower()]
     print("\n--- AMC Earnings (Today) ---")
-    results_amc = []
-    for ticker in amc_tickers:
-        try:
-            symbol = ticker['act_symbol'] if isinstance(ticker, dict) else ticker
-            result = compute_recommendation(symbol)
-            if ignore_filters:
-                results_amc.append({'ticker': symbol, 'result': result})
-            else:
-                if (
-                    isinstance(result, dict)
-                    and result.get('avg_volume')
-                    and result.get('iv30_rv30')
-                    and result.get('ts_slope_0_45')
-                ):
-                    results_amc.append({'ticker': symbol, 'result': result})
-        except Exception as e:
-            print(f"Error for {ticker}: {e}")
-            continue
+    amc_symbols = [t['act_symbol'] if isinstance(t, dict) else t for t in amc_tickers]
+    results_amc = screen_tickers(amc_symbols, ignore_filters)
     for entry in results_amc:
         print(entry)
 
     # Process BMO earnings for tomorrow
-    tomorrows = get_tomorrows_earnings()
     bmo_tickers = [t for t in tomorrows if t.get('when') and 'before' in t['when'].lower()]
     print("\n--- BMO Earnings (Tomorrow) ---")
-    results_bmo = []
-    for ticker in bmo_tickers:
-        try:
-            symbol = ticker['act_symbol'] if isinstance(ticker, dict) else ticker
-            result = compute_recommendation(symbol)
-            if ignore_filters:
-                results_bmo.append({'ticker': symbol, 'result': result})
-            else:
-                if (
-                    isinstance(result, dict)
-                    and result.get('avg_volume')
-                    and result.get('iv30_rv30')
-                    and result.get('ts_slope_0_45')
-                ):
-                    results_bmo.append({'ticker': symbol, 'result': result})
-        except Exception as e:
-            print(f"Error for {ticker}: {e}")
-            continue
+    bmo_symbols = [t['act_symbol'] if isinstance(t, dict) else t for t in bmo_tickers]
+    results_bmo = screen_tickers(bmo_symbols, ignore_filters)
     for entry in results_bmo:
         print(entry)
 
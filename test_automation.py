@@ -0,0 +1,46 @@
+import numpy as np
+
+from automation import nearest_strike_index, nearest_strike_indices, yang_zhang_nd
+
+
+def test_nearest_strike_indices_orders_by_distance():
+    strikes = np.array([90.0, 95.0, 100.0, 105.0, 110.0])
+    assert nearest_strike_indices(strikes, 101.0, 3).tolist() == [2, 3, 1]
+    assert nearest_strike_indices(strikes, 120.0, 3).tolist() == [4, 3, 2]
+
+
+def test_nearest_strike_indices_fewer_strikes_than_k():
+    strikes = np.array([90.0, 95.0])
+    assert nearest_strike_indices(strikes, 101.0, 3).tolist() == [1, 0]
+
+
+def test_nearest_strike_indices_halfway_price_prefers_lower_strike():
+    strikes = np.arange(50.0, 200.0, 2.5)
+    price = 113.75
+    order = nearest_strike_indices(strikes, price, 3)
+    assert strikes[order].tolist() == [112.5, 115.0, 110.0]
+    assert strikes[nearest_strike_index(strikes, price)] == 112.5
+
+
+def test_nearest_strike_indices_matches_sorted_order_on_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        strikes = np.unique(rng.integers(20, 120, size=rng.integers(4, 40))) * 2.5
+        i = rng.integers(0, len(strikes) - 1)
+        price = (strikes[i] + strikes[i + 1]) / 2
+        expected = sorted(range(len(strikes)), key=lambda j: abs(strikes[j] - price))[:3]
+        assert nearest_strike_indices(strikes, price, 3).tolist() == expected
+
+
+def test_yang_zhang_nd_flat_prices_divide_to_inf():
+    ohlc = np.full((40, 4), 100.0)
+    rv30 = yang_zhang_nd(ohlc)
+    assert rv30 == 0.0
+    with np.errstate(divide='ignore'):
+        assert np.isinf(0.5 / rv30)
+
+
+def test_yang_zhang_nd_nan_bar_returns_nan():
+    ohlc = np.full((40, 4), 100.0)
+    ohlc[-3, 3] = np.nan
+    assert np.isnan(yang_zhang_nd(ohlc))